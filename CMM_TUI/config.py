@@ -1,3 +1,26 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+
+CONFIG_FILE = "settings.json"
+
+@lru_cache(maxsize=1)
+def load_settings():
+    """
+    Reads and parses CONFIG_FILE once; later calls return the cached dictionary.
+
+    Expected JSON keys:
+      - port: Serial port to connect (e.g., "/dev/ttyUSB0" or "COM3")
+      - baud: Baud rate for serial communication (e.g., 115200)
+      - points_x: Number of measurement points along the X-axis
+      - points_y: Number of measurement points along the Y-axis
+      - dist_x: Distance to cover along the X-axis
+      - dist_y: Distance to cover along the Y-axis
+      - output_file: Filename to save the measurement data (CSV format)
+      - modal_motion: Omit repeated G0 words (GRBL, or Marlin with GCODE_MOTION_MODES)
+    """
+    return json.loads(Path(CONFIG_FILE).read_bytes())
+
 class Config:
     def __init__(self):
         # Default settings
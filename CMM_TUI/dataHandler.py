@@ -1,19 +1,25 @@
+from array import array
+
 class DataHandler:
     def __init__(self):
-        self.points = []  # List of captured points (X, Y, Z)
+        # Captured points stored column-wise as packed doubles
+        self._x = array('d')
+        self._y = array('d')
+        self._z = array('d')
     
     def record_point(self, position):
         """Records a point in memory."""
         if position:
-            self.points.append(position)
+            self._x.append(position['X'])
+            self._y.append(position['Y'])
+            self._z.append(position['Z'])
     
     def get_points(self):
-        """Returns all recorded points."""
-        return self.points
+        """Returns all recorded points as (X, Y, Z) coordinate arrays."""
+        return self._x, self._y, self._z
     
     def save_to_file(self, filename="measurements.csv"):
-        """Saves recorded points to a CSV file."""
+        """Saves recorded points to a CSV file with a single write."""
+        rows = "".join(f"{x},{y},{z}\n" for x, y, z in zip(self._x, self._y, self._z))
         with open(filename, 'w') as file:
-            file.write("X,Y,Z\n")
-            for point in self.points:
-                file.write(f"{point['X']},{point['Y']},{point['Z']}\n")
+            file.write("X,Y,Z\n" + rows)
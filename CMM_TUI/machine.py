@@ -5,10 +5,18 @@ This module defines the MachineController class which handles G-code
 commands, movement, and querying the machine position.
 """
 
+import re
 import time
 from serial_comm import SerialComm
 
+# Axis/value pairs in an M114 report, e.g. b"X:10.00"
+_M114_RE = re.compile(rb'([XYZ]):(-?\d+(?:\.\d+)?)')
+
 class MachineController:
+    QUERY_TIMEOUT = 1.0  # Seconds to wait for an M114 position report
+    ACK_TIMEOUT = 10.0   # Seconds to wait for outstanding "ok"s before giving up
+    M114 = b"M114"       # Position query, encoded once
+
     def __init__(self, serial_comm):
         """
         Initialize the MachineController.
@@ -19,57 +27,163 @@ class MachineController:
         self.serial_comm = serial_comm
         self.position = [0.0, 0.0, 0.0]  # Current position [X, Y, Z]
         self.grid_points = []           # List of grid points (if applicable)
+        self._pending_oks = 0           # Commands sent but not yet acknowledged
 
     def send_gcode(self, command):
         """
         Sends a G-code command using the serial communication module.
 
+        Returns immediately; the acknowledgement is counted when it is read by
+        poll_responses() or wait_ok().
+
         Args:
-            command (str): G-code command.
+            command (str or bytes): G-code command.
         """
+        self._pending_oks += 1
         self.serial_comm.send(command)
-        # Optionally, you can read and handle the response here.
-        time.sleep(0.1)
 
-    def query_position(self):
+    def poll_responses(self, max_ms=0):
         """
-        Queries the machine for its current position using M114.
+        Yields controller responses, counting off acknowledgements as they pass.
+
+        All responses should be read through here (or wait_ok()) rather than
+        from the SerialComm directly, so the count stays in step.
+
+        Args:
+            max_ms (float): Maximum time to wait for data, in milliseconds.
+
+        Yields:
+            bytes: Each complete response line.
+        """
+        for line in self.serial_comm.poll_lines(max_ms):
+            if line.startswith((b"ok", b"error")) and self._pending_oks > 0:
+                self._pending_oks -= 1
+            yield line
+
+    def wait_ok(self, n=1):
+        """
+        Waits until n more outstanding commands have been acknowledged.
+
+        Other responses read in the meantime are discarded. If ACK_TIMEOUT
+        passes first, the remaining count is assumed lost and cleared.
+
+        Args:
+            n (int): Number of acknowledgements to wait for.
+        """
+        target = max(self._pending_oks - n, 0)
+        deadline = time.monotonic() + self.ACK_TIMEOUT
+        while self._pending_oks > target:
+            remaining_ms = (deadline - time.monotonic()) * 1000
+            if remaining_ms <= 0:
+                self._pending_oks = 0
+                break
+            for _ in self.poll_responses(remaining_ms):
+                if self._pending_oks <= target:
+                    break
+
+    def request_position(self):
+        """
+        Sends M114 without waiting for the report.
+
+        The caller is expected to pass the reply to parse_position().
+        """
+        self.send_gcode(self.M114)
+
+    def parse_position(self, response):
+        """
+        Parses an M114 report and updates the stored position.
+
+        Args:
+            response (bytes): Report such as b"X:10.00 Y:20.00 Z:30.00 E:0.00".
 
         Returns:
             list: The current [X, Y, Z] coordinates.
         """
-        self.serial_comm.send("M114")
-        time.sleep(0.1)
-        response = self.serial_comm.read_response()
-        # Parse the response string to extract coordinates (implementation needed)
-        # For now, we'll assume the format is "X:10.00 Y:20.00 Z:30.00"
-        coords = {}
-        for part in response.split():
-            if ":" in part:
-                key, value = part.split(":", 1)
-                if key in ("X", "Y", "Z"):
-                    try:
-                        coords[key] = float(value)
-                    except ValueError:
-                        coords[key] = 0.0
-        self.position = [
-            coords.get("X", 0.0),
-            coords.get("Y", 0.0),
-            coords.get("Z", 0.0)
-        ]
+        try:
+            # Fast path for the usual "X:.. Y:.. Z:.." ordering: one forward scan
+            ix = response.index(b"X:") + 2
+            iy = response.index(b"Y:", ix)
+            iz = response.index(b"Z:", iy)
+            end = response.find(b" ", iz)
+            if end < 0:
+                end = len(response)
+            position = [
+                float(response[ix:iy]),
+                float(response[iy + 2:iz]),
+                float(response[iz + 2:end])
+            ]
+        except ValueError:
+            position = self._parse_position_re(response)
+        self.position = position
         return self.position
 
+    @staticmethod
+    def _parse_position_re(response):
+        # Marlin appends stepper counts ("Count X:...") which must not win
+        end = response.find(b"Count")
+        position = [0.0, 0.0, 0.0]
+        for axis, value in _M114_RE.findall(response, 0, end if end >= 0 else len(response)):
+            position[b"XYZ".index(axis)] = float(value)
+        return position
+
+    def query_position(self):
+        """
+        Queries the machine for its current position using M114.
+
+        Returns:
+            list: The current [X, Y, Z] coordinates, or None if no report
+            arrived within QUERY_TIMEOUT (the stored position is left as is).
+        """
+        # Reap every outstanding "ok" first so the report isn't interleaved with them
+        self.wait_ok(self._pending_oks)
+        self.request_position()
+        response = b""
+        deadline = time.monotonic() + self.QUERY_TIMEOUT
+        while not response and time.monotonic() < deadline:
+            remaining_ms = (deadline - time.monotonic()) * 1000
+            for line in self.poll_responses(remaining_ms):
+                if b"X:" in line:
+                    response = line
+                    break
+        if not response:
+            return None
+        return self.parse_position(response)
+
     def move_to(self, x, y, z):
         """
         Moves the machine to the specified coordinates.
 
+        The commanded position is trusted, so no M114 round trip is made.
+
+        Args:
+            x (float): Target X coordinate.
+            y (float): Target Y coordinate.
+            z (float): Target Z coordinate.
+
+        Returns:
+            list: The commanded [X, Y, Z] coordinates.
+        """
+        self.send_gcode(f"G0 X{x} Y{y} Z{z}")
+        self.position = [x, y, z]
+        return self.position
+
+    def move_to_verified(self, x, y, z):
+        """
+        Moves the machine to the specified coordinates and reads back its position.
+
+        Use this only where the reported position is needed, such as when
+        recording a measurement.
+
         Args:
             x (float): Target X coordinate.
             y (float): Target Y coordinate.
             z (float): Target Z coordinate.
+
+        Returns:
+            list: The [X, Y, Z] coordinates reported by the machine, or None
+            if it did not report them in time.
         """
         self.send_gcode(f"G0 X{x} Y{y} Z{z}")
-        # Update internal position by querying the machine after moving
         return self.query_position()
 
     def run_calibration(self):
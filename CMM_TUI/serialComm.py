@@ -4,10 +4,14 @@ Serial Communication Module
 This module manages the serial port connection and data transfer.
 """
 
+import os
+import selectors
 import serial
 import time
 
 class SerialComm:
+    RX_COMPACT = 4096  # Consumed bytes allowed to pile up before the RX buffer is compacted
+
     def __init__(self, port, baud):
         """
         Initialize the serial communication.
@@ -19,35 +23,160 @@ class SerialComm:
         self.port = port
         self.baud = baud
         self.ser = None
+        self._sel = None
+        self._fd = None
+        self._nl = b"\n"
+        self._rxbuf = bytearray()
+        self._rxpos = 0  # Start of the unread data in _rxbuf
 
     def open(self):
         """Opens the serial connection and initializes the device."""
         print("Connecting to serial port...")
         self.ser = serial.Serial(self.port, self.baud)
+        # Ask USB serial drivers (e.g. FTDI) for a 1ms latency timer instead
+        # of the default 16ms. pyserial (>= 3.5) only implements this on
+        # Linux; other POSIX platforms raise NotImplementedError, ports
+        # without the setting raise ValueError, and Windows has no such call.
+        if os.name == "posix":
+            try:
+                self.ser.set_low_latency_mode(True)
+            except (NotImplementedError, ValueError):
+                pass
         # Wake up the device
         self.ser.write("\r\n\r\n".encode())
         time.sleep(2)
         self.ser.flushInput()
+        # Non-blocking reads; waiting is done on the selector instead
+        self.ser.timeout = 0
+        self._fd = self.ser.fileno()
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(self._fd, selectors.EVENT_READ)
+
+    def fileno(self):
+        """
+        Returns the serial port's file descriptor, for use with selectors.
+        """
+        return self._fd
 
     def send(self, command):
         """
         Sends a command over the serial port.
 
         Args:
-            command (str): G-code command to send.
+            command (str or bytes): G-code command to send. Bytes are sent
+                as-is, so frequently sent commands can be encoded once.
         """
         if self.ser is None:
             raise Exception("Serial connection not open.")
-        self.ser.write(f"{command}\n".encode())
+        if isinstance(command, str):
+            command = command.encode()
+        self._write((command, self._nl))
 
-    def read_response(self):
+    def send_many(self, commands):
         """
-        Reads a response from the serial port.
+        Sends several commands over the serial port with a single write.
 
-        Returns:
-            str: The response from the device.
+        Args:
+            commands (list): G-code commands, as str or bytes like send().
+        """
+        if self.ser is None:
+            raise Exception("Serial connection not open.")
+        parts = []
+        for command in commands:
+            if isinstance(command, str):
+                command = command.encode()
+            parts += (command, self._nl)
+        self._write(parts)
+
+    def _write(self, parts):
+        """
+        Writes several byte strings with a single writev() call.
+
+        pyserial keeps the port non-blocking, so a short write is completed
+        through ser.write(), which waits for the port to drain.
+
+        Args:
+            parts (tuple): Byte strings to send in order.
+        """
+        try:
+            written = os.writev(self._fd, parts)
+        except BlockingIOError:
+            written = 0
+        if written < sum(map(len, parts)):
+            self.ser.write(b"".join(parts)[written:])
+
+    def poll_lines(self, max_ms=0):
+        """
+        Yields complete lines received from the serial port.
+
+        Waits at most max_ms for new data, so poll_lines(0) never blocks.
+        Partial lines are kept until their terminator arrives. As with
+        read_response(), use MachineController.poll_responses() instead once
+        a MachineController owns the port.
+
+        Args:
+            max_ms (float): Maximum time to wait for data, in milliseconds,
+                or None to wait until data arrives.
+
+        Yields:
+            bytes: Each complete line, stripped of whitespace.
+
+        Raises:
+            serial.SerialException: If the device has been disconnected.
         """
         if self.ser is None:
             raise Exception("Serial connection not open.")
-        # You may want to read until a certain terminator is reached.
-        return self.ser.readline().decode().strip()
+        # Lines are consumed by moving _rxpos; the consumed bytes are only
+        # dropped once enough have built up, instead of on every line
+        if self._rxpos == len(self._rxbuf):
+            self._rxbuf.clear()
+            self._rxpos = 0
+        elif self._rxpos > self.RX_COMPACT:
+            del self._rxbuf[:self._rxpos]
+            self._rxpos = 0
+        # Don't wait for more data while a complete line is already buffered
+        if self._rxbuf.find(b"\n", self._rxpos) >= 0:
+            timeout = 0
+        else:
+            timeout = None if max_ms is None else max_ms / 1000
+        if self._sel.select(timeout):
+            data = os.read(self._fd, 4096)
+            if not data:
+                # Readable but empty: the device is gone, and the fd would
+                # stay readable forever
+                raise serial.SerialException("Serial device disconnected")
+            self._rxbuf += data
+        while True:
+            end = self._rxbuf.find(b"\n", self._rxpos)
+            if end < 0:
+                break
+            line = bytes(self._rxbuf[self._rxpos:end])
+            self._rxpos = end + 1
+            yield line.strip()
+
+    def read_response(self, timeout=1.0):
+        """
+        Reads a response from the serial port.
+
+        This consumes "ok"s along with everything else, so it must not be used
+        once a MachineController owns the port; read through its
+        poll_responses() instead, which keeps the acknowledgement count.
+
+        Args:
+            timeout (float): Seconds to wait for a complete line, or None to
+                wait as long as it takes.
+
+        Returns:
+            bytes: The response from the device, or b"" if none arrived in time.
+        """
+        if timeout is None:
+            while True:
+                for line in self.poll_lines(None):
+                    return line
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            for line in self.poll_lines(max(remaining, 0) * 1000):
+                return line
+            if remaining <= 0:
+                return b""
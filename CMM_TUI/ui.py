@@ -4,9 +4,28 @@ User Interface Module
 This module implements the ncurses TUI for interacting with the user.
 """
 
+import collections
 import curses
+import os
+import selectors
+import signal
+import sys
+import time
 
 class UserInterface:
+    FRAME_S = 1 / 60   # Shortest time between two screen updates
+    LOG_ROW = 6        # First screen row of the controller response log
+    LOG_LINES = 10     # Number of controller responses kept on screen
+
+    # DEC private mode 2026 (synchronized output): the terminal holds
+    # everything written between these and shows it at once. Terminals
+    # that do not support it ignore the sequences.
+    SYNC_BEGIN = "\x1b[?2026h"
+    SYNC_END = "\x1b[?2026l"
+
+    # Fixed-width fields keep the line from jumping about as values change
+    _FMT = "Position - X: {:7.2f}, Y: {:7.2f}, Z: {:7.2f}".format
+
     def __init__(self, machine_controller):
         """
         Initialize the UserInterface.
@@ -15,6 +34,18 @@ class UserInterface:
             machine_controller (MachineController): The machine controller instance.
         """
         self.machine_controller = machine_controller
+        self.responses = collections.deque(maxlen=self.LOG_LINES)
+        self.position_pending = False
+        self._position_deadline = 0.0  # time.monotonic() when a pending query is given up
+        self.position = None        # Last reported position, drawn on the next frame
+        self._position_text = None  # Position line currently on screen
+        self._drawn_position = None # Position object last passed to _draw_position()
+        self._resized = False       # Terminal resized since the last frame
+        self._winch = False         # SIGWINCH received but not yet passed to curses
+        self._log_new = 0           # Responses not yet drawn to the log
+        self._next_frame = 0.0      # time.monotonic() when the next frame is due
+        self._log = None            # Window holding the response log
+        self._log_rows = 0          # Rows of the response log in use
 
     def run(self):
         """
@@ -29,11 +60,194 @@ class UserInterface:
         # Clear screen
         stdscr.clear()
         stdscr.addstr(0, 0, "Welcome to the Machine Control Interface")
-        stdscr.addstr(2, 0, "Press 'q' to quit.")
+        stdscr.addstr(2, 0, "Press 'p' to query the position, 'q' to quit.")
         stdscr.refresh()
+        curses.curs_set(0)
+
+        # The log scrolls within its own window, so only new lines are drawn
+        self._log = curses.newwin(self.LOG_LINES, stdscr.getmaxyx()[1], self.LOG_ROW, 0)
+        self._log.scrollok(True)
+        self._log.idlok(True)
+
+        # Sleep until a key or controller data is ready, then handle everything
+        # that arrived without blocking on either. Input is handled on every
+        # wake-up, the screen is only updated at most once per FRAME_S. A
+        # selector is used rather than stdscr.timeout() so that controller
+        # data wakes the loop as well.
+        stdscr.nodelay(True)
+        events = selectors.DefaultSelector()
+        events.register(sys.stdin, selectors.EVENT_READ)
+        events.register(self.machine_controller.serial_comm.fileno(), selectors.EVENT_READ)
+
+        # curses only notices a resize inside getch(), so SIGWINCH is taken
+        # over to wake the selector through a pipe; resizeterm() then queues
+        # KEY_RESIZE for the key loop as curses' own handler would.
+        winch_r, winch_w = os.pipe()
+        os.set_blocking(winch_r, False)
+        os.set_blocking(winch_w, False)
+        events.register(winch_r, selectors.EVENT_READ)
+        old_wakeup_fd = signal.set_wakeup_fd(winch_w)
+        old_winch = signal.signal(signal.SIGWINCH, self._on_winch)
 
-        while True:
-            key = stdscr.getch()
-            if key == ord('q'):
-                break
-            # Further key handling and UI updates will be added here.
+        try:
+            while True:
+                events.select(self._wait_time())
+                try:
+                    os.read(winch_r, 4096)  # Signal numbers; only the flag matters
+                except BlockingIOError:
+                    pass
+                if self._winch:
+                    self._winch = False
+                    cols, lines = os.get_terminal_size(sys.__stdout__.fileno())
+                    curses.resizeterm(lines, cols)
+                self._drain_responses()
+
+                key = stdscr.getch()
+                while key != -1:
+                    if key == ord('q'):
+                        return
+                    self._handle_key(stdscr, key)
+                    key = stdscr.getch()
+
+                now = time.monotonic()
+                if now >= self._next_frame and self._render(stdscr):
+                    self._next_frame = now + self.FRAME_S
+        finally:
+            signal.signal(signal.SIGWINCH, old_winch)
+            signal.set_wakeup_fd(old_wakeup_fd)
+            os.close(winch_r)
+            os.close(winch_w)
+
+    def _on_winch(self, signum, frame):
+        """
+        SIGWINCH handler; the resize is passed to curses by the main loop.
+        """
+        self._winch = True
+
+    def _wait_time(self):
+        """
+        Returns how long the main loop may sleep, in seconds, or None for no limit.
+
+        Without input the loop only has to wake up for a frame that is
+        waiting to be drawn or for a position query that is about to expire.
+        """
+        now = time.monotonic()
+        deadlines = []
+        if self._changed():
+            deadlines.append(self._next_frame)
+        if self.position_pending:
+            deadlines.append(self._position_deadline)
+        if not deadlines:
+            return None
+        return max(min(deadlines) - now, 0)
+
+    def _drain_responses(self):
+        """
+        Reads all available controller responses. They are drawn on the next frame.
+        """
+        for line in self.machine_controller.poll_responses(0):
+            if self.position_pending:
+                if b"X:" in line:
+                    self.position_pending = False
+                    self.position = self.machine_controller.parse_position(line)
+                elif line.startswith(b"error"):
+                    self.position_pending = False
+            self.responses.append(line)
+            self._log_new += 1
+        # Let 'p' be used again if the report never arrives
+        if self.position_pending and time.monotonic() > self._position_deadline:
+            self.position_pending = False
+
+    def _handle_key(self, stdscr, key):
+        """
+        Handles a single key press.
+        """
+        if key == curses.KEY_RESIZE:
+            # Rebuild the log at the new width from the lines still kept
+            self._log.resize(self.LOG_LINES, stdscr.getmaxyx()[1])
+            self._log.erase()
+            self._log_rows = 0
+            self._log_new = len(self.responses)
+            self._resized = True
+        elif key == ord('p') and not self.position_pending:
+            # The reply is picked up by _drain_responses()
+            self.machine_controller.request_position()
+            self.position_pending = True
+            self._position_deadline = time.monotonic() + self.machine_controller.QUERY_TIMEOUT
+        # Further key handling and UI updates will be added here.
+
+    def _render(self, stdscr):
+        """
+        Draws everything that changed since the last frame.
+
+        Returns:
+            bool: False if nothing changed, in which case no frame is sent.
+        """
+        if not self._changed():
+            return False
+        self.begin_frame()
+        if self.position is not self._drawn_position:
+            self._drawn_position = self.position
+            self._draw_position(stdscr, self.position)
+        if self._log_new:
+            new = min(self._log_new, self.LOG_LINES)
+            self._log_new = 0
+            self._draw_responses(list(self.responses)[-new:])
+        self._resized = False
+        self.end_frame()
+        return True
+
+    def _changed(self):
+        """
+        Returns True if anything needs to be drawn on the next frame.
+        """
+        # A new report always replaces self.position, so identity is enough
+        return (self.position is not self._drawn_position
+                or self._log_new > 0 or self._resized)
+
+    def begin_frame(self):
+        """
+        Starts a frame. Drawing between begin_frame() and end_frame() only
+        updates curses' virtual screen.
+        """
+        sys.stdout.write(self.SYNC_BEGIN)
+        sys.stdout.flush()
+
+    def end_frame(self):
+        """
+        Sends everything drawn during the frame to the terminal in one update.
+        """
+        curses.doupdate()
+        sys.stdout.write(self.SYNC_END)
+        sys.stdout.flush()
+
+    def _draw_position(self, stdscr, position):
+        """
+        Draws the last reported machine position, if it changed.
+        """
+        text = self._FMT(*position)
+        if text == self._position_text:
+            return
+        self._position_text = text
+        stdscr.move(4, 0)
+        stdscr.clrtoeol()
+        stdscr.addstr(4, 0, text)
+        stdscr.noutrefresh()
+
+    def _draw_responses(self, lines):
+        """
+        Appends lines to the response log, scrolling it once it is full.
+
+        Only the new lines are drawn; existing rows are moved by curses.
+        """
+        log = self._log
+        w = log.getmaxyx()[1]
+        for line in lines:
+            if self._log_rows < self.LOG_LINES:
+                row = self._log_rows
+                self._log_rows += 1
+            else:
+                log.scroll(1)
+                row = self.LOG_LINES - 1
+            log.addnstr(row, 0, line, w - 1)
+        log.noutrefresh()
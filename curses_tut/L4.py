@@ -1,17 +1,21 @@
 import curses
+from functools import lru_cache
 
 menu = ['Home', 'View Files', 'Settings', 'Help', 'Exit']
 
+@lru_cache(maxsize=1)
+def menu_layout(h, w):
+    # (y, x, item) for each entry, only recomputed when the window size changes
+    return [(h//2 - len(menu)//2 + idx, w//2 - len(item)//2, item)
+            for idx, item in enumerate(menu)]
+
 def print_menu(win, selected_idx):
     win.clear()
     win.border()
     
     h, w = win.getmaxyx()
     
-    for idx, item in enumerate(menu):
-        x = w//2 - len(item)//2
-        y = h//2 - len(menu)//2 + idx
-        
+    for idx, (y, x, item) in enumerate(menu_layout(h, w)):
         if idx == selected_idx:
             # Highlight the selected item
             win.attron(curses.color_pair(1))
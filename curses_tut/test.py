@@ -8,9 +8,12 @@ SELECTED_COLOR = 2
 def list_dir(path):
     """ List directories and files in the given path. """
     try:
-        entries = os.listdir(path)
-        entries.sort(key=lambda e: (os.path.isdir(os.path.join(path, e)), e.lower()))
-        return entries
+        # scandir() entries know their type from the directory listing, so
+        # sorting files before folders needs no stat() per entry
+        with os.scandir(path) as it:
+            entries = [(e.is_dir(), e.name.lower(), e.name) for e in it]
+        entries.sort()
+        return [e[2] for e in entries]
     except PermissionError:
         return []
 
@@ -19,8 +22,12 @@ def print_menu(win, entries, selected_idx, current_path):
     win.border()
     h, w = win.getmaxyx()
 
+    # Look up the colour attributes once rather than for every entry
+    menu_attr = curses.color_pair(MENU_COLOR)
+    sel_attr = curses.color_pair(SELECTED_COLOR)
+
     # Display current directory path at the top
-    win.addstr(1, 2, f"Current Directory: {current_path}", curses.color_pair(MENU_COLOR))
+    win.addstr(1, 2, f"Current Directory: {current_path}", menu_attr)
 
     # Display each entry in the list
     for idx, entry in enumerate(entries):
@@ -30,14 +37,12 @@ def print_menu(win, entries, selected_idx, current_path):
         if y >= h - 1:  # Prevent text from running off the screen
             break
 
-        if idx == selected_idx:
-            win.attron(curses.color_pair(SELECTED_COLOR))
-            win.addstr(y, x, entry)
-            win.attroff(curses.color_pair(SELECTED_COLOR))
-        else:
-            win.addstr(y, x, entry)
-    
-    win.refresh()
+        # Pass the attribute with the text instead of toggling it around the call
+        attr = sel_attr if idx == selected_idx else curses.A_NORMAL
+        win.addnstr(y, x, entry, w - 4, attr)
+
+    # The caller pushes the update to the screen with curses.doupdate()
+    win.noutrefresh()
 
 def main(stdscr):
     # Initialize colors
@@ -58,6 +63,7 @@ def main(stdscr):
     current_idx = 0
 
     print_menu(win, entries, current_idx, current_path)
+    curses.doupdate()
     
     while True:
         key = stdscr.getch()
@@ -78,18 +84,19 @@ def main(stdscr):
             elif os.path.isfile(selected_path):
                 # Display file content (if it's a text file)
                 try:
-                    with open(selected_path, 'r') as file:
-                        content = file.read()
-                    
-                    # Display file content in the window
-                    win.clear()
-                    win.border()
-                    win.addstr(1, 1, f"Viewing {selected}", curses.color_pair(MENU_COLOR))
-                    for i, line in enumerate(content.splitlines()):
-                        if i + 3 >= h - 1:
-                            break
-                        win.addstr(i + 3, 1, line[:w - 2])
-                    win.refresh()
+                    # Only read as many lines as fit inside the window border
+                    win_h, win_w = win.getmaxyx()
+                    with open(selected_path, 'r', errors='replace') as file:
+                        win.clear()
+                        win.border()
+                        win.addstr(1, 1, f"Viewing {selected}", curses.color_pair(MENU_COLOR))
+                        for i in range(win_h - 4):
+                            line = file.readline()
+                            if not line:
+                                break
+                            win.addnstr(i + 3, 1, line.rstrip('\n'), win_w - 2)
+                    win.noutrefresh()
+                    curses.doupdate()
                     
                     # Wait for user to press a key to go back
                     stdscr.getch()
@@ -100,6 +107,7 @@ def main(stdscr):
             break
 
         print_menu(win, entries, current_idx, current_path)
+        curses.doupdate()
 
 # Run the program
 curses.wrapper(main)
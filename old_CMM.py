@@ -16,14 +16,27 @@ Key functionalities include:
          * "Free" mode: allows manual control and point collection.
     - Using ANSI escape codes for styled terminal output.
 """
-import json
-import serial
 import time
 import sys
 import termios
 import tty
 import os
-import csv
+import collections
+import contextlib
+import re
+import select
+
+from CMM_TUI.config import load_settings
+from CMM_TUI.serialComm import SerialComm
+
+# Position query, encoded once since it is sent for every measured point
+_M114 = b"M114"
+
+# Seconds to wait for the M114 report before giving up.
+QUERY_TIMEOUT = 1.0
+
+# The X, Y and Z values at the start of an M114 report, e.g. b"X:10.00 Y:20.00 Z:30.00"
+_POS_RE = re.compile(rb'X:(-?\d+\.?\d*)\s*Y:(-?\d+\.?\d*)\s*Z:(-?\d+\.?\d*)')
 
 def query_current_position():
     """
@@ -31,67 +44,119 @@ def query_current_position():
     Assumes the machine's axes have been homed.
     
     Returns:
-        list: A list containing [X, Y, Z] coordinates.
+        list: A list containing [X, Y, Z] coordinates in micrometres, or None
+        if no report arrived within QUERY_TIMEOUT or it could not be parsed.
     """
-    # Send M114 command to query the position.
-    s.write("M114\n".encode())
-    time.sleep(0.1)  # Allow time for the machine to respond
+    # Wait for queued moves so the report isn't interleaved with their "ok"s.
+    sender.flush()
 
-    # Read the response from the serial port.
-    # Depending on your firmware, you might need to read multiple lines.
-    response = s.readline().decode().strip()
+    # Send M114 command to query the position; its "ok" is reaped later.
+    sender.send(_M114)
+
+    # Read each line as soon as it arrives, skipping any echo/busy messages
+    # the firmware sends before the report itself. An "ok" or "error" first
+    # means no report is coming; it acknowledges M114, so count it off here.
+    deadline = time.monotonic() + QUERY_TIMEOUT
+    response = b""
+    while b"X:" not in response:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        response = sender.readline(remaining)
+        if response.startswith((b"ok", b"error")):
+            sender.acknowledge()
+            return None
 
     # Parse the response, expecting a format like: "X:10.00 Y:20.00 Z:30.00 E:0.00 ..."
-    coords = {}
-    for part in response.split():
-        if ":" in part:
-            key, value = part.split(":", 1)
-            if key in ("X", "Y", "Z"):
-                try:
-                    coords[key] = float(value)
-                except ValueError:
-                    coords[key] = 0.0
-    # Return the X, Y, Z coordinates, defaulting to 0 if not found.
-    return [coords.get("X", 0.0), coords.get("Y", 0.0), coords.get("Z", 0.0)]
-
-def read_settings():
-    """
-    Reads the settings from 'settings.json' and returns them as a dictionary.
-    
-    Expected JSON keys:
-      - port: Serial port to connect (e.g., "/dev/ttyUSB0" or "COM3")
-      - baud: Baud rate for serial communication (e.g., 115200)
-      - points_x: Number of measurement points along the X-axis
-      - points_y: Number of measurement points along the Y-axis
-      - dist_x: Distance to cover along the X-axis
-      - dist_y: Distance to cover along the Y-axis
-      - output_file: Filename to save the measurement data (CSV format)
-    """
-    with open("settings.json") as settings_json:
-        settings = json.load(settings_json)
-        return settings
-
-def open_serial():
-    """
-    Opens a serial connection using settings read from 'settings.json'.
+    # The first match is the position; Marlin's trailing "Count X:..." is never reached.
+    match = _POS_RE.search(response)
+    if match is None:
+        return None
+    return [round(float(value) * 1000) for value in match.groups()]
+
+class StreamingSender:
+    """
+    Streams G-code using character-counting flow control.
     
-    Actions:
-      - Prints a message indicating the attempt to connect.
-      - Sends a wake-up command to the device.
-      - Waits for the device to initialize.
-      - Flushes any startup text from the serial input buffer.
+    Instead of waiting for each command to be acknowledged before sending the
+    next, up to RX_BUFFER_SIZE bytes are kept in flight so the firmware planner
+    always has queued moves. Every "ok" (or "error") frees the oldest command.
     
-    Returns:
-      An open serial connection object.
+    Attributes:
+      inflight (deque): (length, command) for each unacknowledged command.
+      pending_bytes (int): Total bytes of all unacknowledged commands.
     """
-    print("Connecting to serial...")
-    s = serial.Serial(settings["port"], settings["baud"])
+    RX_BUFFER_SIZE = 127  # Usable bytes in the firmware's serial RX buffer
+
+    def __init__(self, comm):
+        self.comm = comm
+        self.inflight = collections.deque()
+        self.pending_bytes = 0
+
+    def send(self, cmd):
+        """
+        Queues a single command, waiting only while the RX buffer would overflow.
+
+        The command may be given as str or, to skip encoding it, as bytes.
+        """
+        length = len(cmd) + 1  # Includes the newline
+        while self.inflight and self.pending_bytes + length > self.RX_BUFFER_SIZE:
+            self._drain_one_ok()
+        self.comm.send(cmd)
+        self.inflight.append((length, cmd))
+        self.pending_bytes += length
+
+    def send_many(self, cmds):
+        """
+        Queues several commands with one write once they all fit in the RX buffer.
+        
+        Sequences too long for the buffer are sent one command at a time.
+        Commands may be str or bytes, as for send().
+        """
+        total = sum(len(cmd) + 1 for cmd in cmds)
+        if not cmds:
+            return
+        if total > self.RX_BUFFER_SIZE:
+            for cmd in cmds:
+                self.send(cmd)
+            return
+        while self.inflight and self.pending_bytes + total > self.RX_BUFFER_SIZE:
+            self._drain_one_ok()
+        self.comm.send_many(cmds)
+        for cmd in cmds:
+            self.inflight.append((len(cmd) + 1, cmd))
+        self.pending_bytes += total
 
-    # Send wake-up command to the serial device.
-    s.write("\r\n\r\n".encode())
-    time.sleep(2)   # Wait for initial device initialization
-    s.flushInput()  # Flush any startup text from the buffer
-    return s
+    def flush(self):
+        """
+        Waits until every queued command has been acknowledged.
+        """
+        while self.inflight:
+            self._drain_one_ok()
+
+    def readline(self, timeout=None):
+        """
+        Returns the next line received from the machine, stripped of whitespace.
+        
+        Waits up to timeout seconds (or indefinitely if None) for a complete
+        line, returning b"" if none arrives.
+        """
+        return self.comm.read_response(timeout)
+
+    def acknowledge(self):
+        """
+        Frees the oldest in-flight command after its "ok" or "error" was read.
+        """
+        length, _ = self.inflight.popleft()
+        self.pending_bytes -= length
+
+    def _drain_one_ok(self):
+        # Skip status/echo lines until the next acknowledgement arrives
+        while True:
+            response = self.readline()
+            if response.startswith((b"ok", b"error")):
+                break
+        self.acknowledge()
 
 def send_gcode(l):
     """
@@ -100,21 +165,172 @@ def send_gcode(l):
     Parameters:
       l (str): A string that may contain multiple lines of G-code.
       
-    For each non-empty line:
-      - Strips end-of-line characters.
-      - Appends a newline character.
-      - Writes the command to the serial port.
-      - Reads and discards any immediate response from the device.
+    For each line:
+      - Strips comments and surrounding whitespace.
+      - Skips the line if nothing is left.
+      - Queues the command on the streaming sender without waiting for its "ok".
     """
-    l = l.strip()  # Remove extraneous whitespace or EOL characters
-
     for line in l.splitlines():
-        if not line.isspace() and len(line) > 0:
-            line = line + "\n"
-            s.write(line.encode())  # Send the G-code command
-            # Read any responses available in the serial buffer
-            while s.inWaiting() > 0:
-                response = s.readline().decode().strip()
+        line = line.split(";", 1)[0].strip()
+        if line:
+            sender.send(line)
+
+def send_gcode_multi(lines):
+    """
+    Sends a known sequence of G-code commands with a single serial write.
+    
+    Parameters:
+      lines (list): Commands without newlines; empty entries are skipped.
+    """
+    sender.send_many([line for line in lines if line])
+
+# Last word sent for each modal group/axis; None forces the word to be sent.
+_last_modal = {"motion": None, "X": None, "Y": None, "Z": None, "F": None}
+
+def fmt(um):
+    """
+    Formats an integer micrometre value as millimetres for G-code and CSV output.
+    
+    At most 3 decimals are written and trailing zeros are dropped, so 12300
+    becomes "12.3" and 5000 becomes "5".
+    """
+    sign = "-" if um < 0 else ""
+    mm, frac = divmod(abs(um), 1000)
+    return f"{sign}{mm}.{frac:03d}".rstrip("0").rstrip(".")
+
+def reset_modal():
+    """
+    Forgets the modal state so the next move sends every word explicitly.
+    """
+    for word in _last_modal:
+        _last_modal[word] = None
+
+def move_line(motion="G0", **words):
+    """
+    Builds a movement command containing only the words that changed.
+    
+    Parameters:
+      motion (str): Motion word, e.g. "G0" or "G1".
+      **words: Integer micrometre targets keyed by word letter (X, Y, Z, F).
+    
+    Axis words matching the last sent value are dropped. The motion word itself
+    is only dropped when the "modal_motion" setting is enabled, as Marlin needs
+    GCODE_MOTION_MODES to accept bare axis words. The modal state is updated,
+    so the returned line must be sent.
+    
+    Returns:
+      str: The command, or "" if nothing changed.
+    """
+    changed = {}
+    for word, value in words.items():
+        last = _last_modal[word]
+        if value != last:
+            changed[word] = value
+    if not changed:
+        return ""
+
+    line = "".join(f"{word}{fmt(value)}" for word, value in changed.items())
+    if motion != _last_modal["motion"] or not settings.get("modal_motion", False):
+        line = motion + line
+
+    _last_modal["motion"] = motion
+    _last_modal.update(changed)
+    return line
+
+def move(motion="G0", **words):
+    """
+    Sends a movement command containing only the words that changed.
+    
+    Takes the same parameters as move_line().
+    """
+    line = move_line(motion, **words)
+    if line:
+        send_gcode(line)
+
+# Axes jogged since the last move was sent; see queue_jog() and read_key().
+_pending_jog = set()
+_jog_started = 0.0  # time.monotonic() of the oldest unsent jog
+
+# Keyboard idle time after which queued jogs are sent, in seconds. This must be
+# clearly longer than the key repeat interval (40ms for X11's default 25Hz,
+# with some jitter), or a held key still sends one move per repeat.
+JOG_COALESCE_S = 0.08
+
+# Longest a jog is held back while keys keep arriving, in seconds, so a held
+# key moves the head in steps as it is held rather than all at once on release.
+JOG_MAX_HOLD_S = 0.12
+
+def queue_jog(axis, delta):
+    """
+    Adds delta to one axis of CMM.pos without sending it yet.
+    
+    Key repeats arriving within JOG_COALESCE_S of each other are merged, so
+    holding a key sends one move per JOG_MAX_HOLD_S instead of one per repeat.
+    
+    Parameters:
+      axis (str): "X", "Y" or "Z".
+      delta (int): Distance in micrometres.
+    """
+    global _jog_started
+    if not _pending_jog:
+        _jog_started = time.monotonic()
+    CMM.pos["XYZ".index(axis)] += delta
+    _pending_jog.add(axis)
+
+def flush_jogs():
+    """
+    Sends all queued jogs as a single move to CMM.pos.
+    """
+    if _pending_jog:
+        # Iterate "XYZ" rather than the set, whose order varies between runs
+        move(**{axis: CMM.pos[i] for i, axis in enumerate("XYZ") if axis in _pending_jog})
+        _pending_jog.clear()
+
+def read_key():
+    """
+    Waits for a key, sending queued jogs once the keyboard goes idle or the
+    oldest of them has waited JOG_MAX_HOLD_S.
+    
+    Returns:
+      A single character input from the user.
+    """
+    while True:
+        if not _pending_jog:
+            return getch()
+        hold = JOG_MAX_HOLD_S - (time.monotonic() - _jog_started)
+        if hold > 0:
+            char = getch(min(JOG_COALESCE_S, hold))
+            if char:
+                return char
+        flush_jogs()
+
+def save_datapoints():
+    """
+    Saves CMM.datapoints to the output CSV file, in millimetres.
+    
+    The whole file is formatted in memory and written with a single call.
+    Rows end in CRLF, as they did when written with csv.writer.
+    
+    Returns:
+      str: The CSV text that was written.
+    """
+    text = "".join(f"{fmt(x)},{fmt(y)},{fmt(z)}\r\n" for x, y, z in CMM.datapoints)
+    with open(settings["output_file"], "w", newline="") as f:
+        f.write(text)
+    return text
+
+def grid_axis(start, dist, n):
+    """
+    Returns n evenly spaced coordinates, in micrometres, from start to start + dist.
+    
+    Parameters:
+      start (int): First coordinate in micrometres.
+      dist (float): Distance to cover in millimetres.
+      n (int): Number of points; a single point sits at start.
+    """
+    if n < 2:
+        return [start]
+    return [start + round(i * dist * 1000 / (n - 1)) for i in range(n)]
 
 def gotopoint():
     """
@@ -126,36 +342,57 @@ def gotopoint():
       - Moves the tool head to the specified X and Y coordinates.
       - Updates the current position stored in CMM.pos.
     """
-    # Move to starting Z position before moving in X and Y
-    send_gcode(f"G0Z{CMM.start[2]}")
-    
+    # Send every word after the Z retraction, the firmware state may differ
+    reset_modal()
+    _pending_jog.clear()
+
     # Get current measurement point from the grid
     point = CMM.point_list[CMM.point]
     
-    # Move to the target X and Y coordinates
-    send_gcode(f"G0X{point[0]}Y{point[1]}")
+    # Move to starting Z position, then to the target X and Y coordinates.
+    # Both are written together so the planner receives them back to back.
+    send_gcode_multi([
+        move_line(Z=CMM.start[2]),
+        move_line(X=point[0], Y=point[1]),
+    ])
     
     # Update current position with new X, Y and starting Z (unchanged)
     CMM.pos = [point[0], point[1], CMM.start[2]]
 
-def getch():
+@contextlib.contextmanager
+def raw_tty():
     """
-    Captures a single character from standard input without the need for the Enter key.
-    
-    This function temporarily sets the terminal to raw mode, reads one character, 
-    and then restores the terminal's original settings.
+    Puts the terminal into unbuffered, no-echo mode for the duration of the block.
     
-    Returns:
-      A single character input from the user.
+    Switching modes once per session replaces the tcgetattr/setraw/tcsetattr
+    calls getch() used to make on every keystroke. Output processing is left
+    on so print() still starts new lines at column 0. The original settings
+    are restored however the block is left, including exit().
     """
     fd = sys.stdin.fileno()
     old_settings = termios.tcgetattr(fd)
     try:
-        tty.setraw(sys.stdin.fileno())
-        ch = sys.stdin.read(1)
+        tty.setcbreak(fd)
+        yield
     finally:
         termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-    return ch
+
+def getch(timeout=None):
+    """
+    Captures a single character from standard input without the need for the Enter key.
+    
+    Must be called inside raw_tty(), which disables line buffering and echo.
+    
+    Parameters:
+      timeout (float): Seconds to wait for a key, or None to wait indefinitely.
+    
+    Returns:
+      A single character input from the user, or "" if the timeout expired.
+    """
+    fd = sys.stdin.fileno()
+    if timeout is not None and not select.select([fd], [], [], timeout)[0]:
+        return ""
+    return os.read(fd, 1).decode(errors="replace")
 
 class CMM:
     """
@@ -163,13 +400,18 @@ class CMM:
     
     Attributes:
       point (int): Index of the current measurement point in the grid.
-      point_list (list): List of grid points; each point is a list [X, Y].
+      point_list (list): List of grid points in visiting order; each point is a list [X, Y].
+      index_map (list): Raster-order index of each entry in point_list.
       start (list): Starting position as [X, Y, Z].
       pos (list): Current machine position as [X, Y, Z].
       datapoints (list): List for storing measurement data (positions).
+    
+    All coordinates are integer micrometres, so repeated jogs don't accumulate
+    floating point error and are formatted with fmt() when sent or saved.
     """
     point = 0  # Current index in the grid
     point_list = []  # List to store all generated grid points
+    index_map = []   # Raster-order index of each grid point
 
     start = [0, 0, 0]  # Starting position [X, Y, Z]
     pos = [0, 0, 0]    # Current position [X, Y, Z]
@@ -183,9 +425,38 @@ G28 ; Home all axes
 ; G1 Z50 F5000 ; Move Z Axis up to allow attachment of CMM
 """
 
+# Control prompts, built once rather than each time they are printed.
+_MODE_HELP = (
+    "\033[1mMODE SELECTION\033[0m\n"
+    "\033[95m\033[1mZ\033[0m: Rectangle    \033[95m\033[1mX\033[0m: Free"
+)
+_CALIBRATION_HELP = (
+    "\033[1mINITIAL CALIBRATION\033[0m\n"
+    "\033[95m\033[1mX\033[0m: Exit    \033[95m\033[1mE\033[0m: Z Up    "
+    "\033[95m\033[1mQ\033[0m: Z Down    \033[95m\033[1mW\033[0m: Y Up    "
+    "\033[95m\033[1mS\033[0m: Y Down\033[0m    \033[95m\033[1mA\033[0m: X Up    "
+    "\033[95m\033[1mD\033[0m: X Down    \033[95m\033[1mY\033[0m: Accept Start Position\033[0m"
+)
+_RECT_HELP = (
+    "\033[95m\033[1mX\033[0m: Quit    "
+    "\033[95m\033[1mW/I\033[0m: Z Up    \033[95m\033[1mS/K\033[0m: Z Down    "
+    "\033[95m\033[1mD\033[0m: Next Grid Point    \033[95m\033[1mA\033[0m: Previous Grid Point    "
+    "\033[95m\033[1mE\033[0m: Save & Next Grid Point\033[0m"
+)
+_FREE_HELP = (
+    "\033[95m\033[1mX\033[0m: Quit    "
+    "\033[95m\033[1mW/I\033[0m: Y Up    \033[95m\033[1mS/K\033[0m: Y Down    "
+    "\033[95m\033[1mD/L\033[0m: X Up    \033[95m\033[1mA/J\033[0m: X Down    "
+    "\033[95m\033[1mE/O\033[0m: Z Up    \033[95m\033[1mQ/U\033[0m: Z Down    "
+    "\033[95m\033[1mP\033[0m: Save Point    \033[95m\033[1mZ\033[0m: Undo Point    "
+    "\033[95m\033[1mG\033[0m: Save File"
+)
+
 # Read settings from JSON file and open the serial connection.
-settings = read_settings()
-s = open_serial()
+settings = load_settings()
+comm = SerialComm(settings["port"], settings["baud"])
+comm.open()
+sender = StreamingSender(comm)
 
 # Send the startup G-code sequence.
 print("Sending startup GCODE")
@@ -193,217 +464,192 @@ send_gcode(startup_gcode)
 # Uncomment the next line if you want to preset the Z axis position.
 # CMM.pos[2] = 50
 
-# Mode selection prompt.
-print(f"\033[1mMODE SELECTION\033[0m")
-print(f"\033[95m\033[1mZ\033[0m: Rectangle    \033[95m\033[1mX\033[0m: Free")
-
-# Wait for user to select a mode by pressing 'z' (Rectangle) or 'x' (Free).
-while True:
-    char = getch()
-    if char == "z":
-        mode = "Rectangle"
-        break
-    if char == "x":
-        mode = "Free"
-        break
-
-if mode == "Rectangle":
-    # --- RECTANGLE MODE: Grid-based Measurement ---
-    print(f"\033[1mINITIAL CALIBRATION\033[0m")
-    print(
-        f"\033[95m\033[1mX\033[0m: Exit    \033[95m\033[1mE\033[0m: Z Up    "
-        f"\033[95m\033[1mQ\033[0m: Z Down    \033[95m\033[1mW\033[0m: Y Up    "
-        f"\033[95m\033[1mS\033[0m: Y Down\033[0m    \033[95m\033[1mA\033[0m: X Up    "
-        f"\033[95m\033[1mD\033[0m: X Down    \033[95m\033[1mY\033[0m: Accept Start Position\033[0m"
-    )
-
-    # Calibration loop: Adjust starting position until the user accepts it.
+# Keep the terminal in raw mode for the whole session, restoring it on exit.
+with raw_tty():
+    # Mode selection prompt.
+    print(_MODE_HELP)
+
+    # Wait for user to select a mode by pressing 'z' (Rectangle) or 'x' (Free).
     while True:
         char = getch()
+        if char == "z":
+            mode = "Rectangle"
+            break
         if char == "x":
-            exit(0)
-        if char == "e":
-            # Increase Z by 1mm.
-            CMM.pos[2] += 1
-            send_gcode("G0Z" + str(CMM.pos[2]))
-        if char == "q":
-            # Decrease Z by 1mm.
-            CMM.pos[2] -= 1
-            send_gcode("G0Z" + str(CMM.pos[2]))
-        elif char == "w":
-            # Increase Y by 5mm.
-            CMM.pos[1] += 5
-            send_gcode("G0Y" + str(CMM.pos[1]))
-        elif char == "s":
-            # Decrease Y by 5mm.
-            CMM.pos[1] -= 5
-            send_gcode("G0Y" + str(CMM.pos[1]))
-        elif char == "a":
-            # Increase X by 5mm (moving left on the screen).
-            CMM.pos[0] -= 5
-            send_gcode("G0X" + str(CMM.pos[0]))
-        elif char == "d":
-            # Decrease X by 5mm (moving right on the screen).
-            CMM.pos[0] += 5
-            send_gcode("G0X" + str(CMM.pos[0]))
-        elif char == "y":
-            # Accept the current position as the starting position.
-            print("Accepted position")
-            CMM.start = CMM.pos
+            mode = "Free"
             break
 
-    # Generate grid points based on settings.
-    for x in range(settings["points_x"]):
-        pos_x = CMM.start[0] + x / (settings["points_x"] - 1) * settings["dist_x"]
-        for y in range(settings["points_y"]):
-            pos_y = CMM.start[1] + y / (settings["points_y"] - 1) * settings["dist_y"]
-            CMM.point_list.append([pos_x, pos_y])
+    if mode == "Rectangle":
+        # --- RECTANGLE MODE: Grid-based Measurement ---
+        print(_CALIBRATION_HELP)
 
-    # Initialise the datapoints list with the same number of elements as grid points.
-    print("Initialising datapoints list...")
-    CMM.datapoints = [0] * len(CMM.point_list)
+        # Calibration loop: Adjust starting position until the user accepts it.
+        while True:
+            char = read_key()
+            if char == "x":
+                exit(0)
+            if char == "e":
+                # Increase Z by 1mm.
+                queue_jog("Z", 1000)
+            if char == "q":
+                # Decrease Z by 1mm.
+                queue_jog("Z", -1000)
+            elif char == "w":
+                # Increase Y by 5mm.
+                queue_jog("Y", 5000)
+            elif char == "s":
+                # Decrease Y by 5mm.
+                queue_jog("Y", -5000)
+            elif char == "a":
+                # Increase X by 5mm (moving left on the screen).
+                queue_jog("X", -5000)
+            elif char == "d":
+                # Decrease X by 5mm (moving right on the screen).
+                queue_jog("X", 5000)
+            elif char == "y":
+                # Accept the current position as the starting position.
+                flush_jogs()
+                print("Accepted position")
+                CMM.start = list(CMM.pos)
+                break
 
-    # Move to the first grid point.
-    gotopoint()
+        # Generate grid points based on settings, computing each axis' coordinates once.
+        xs = grid_axis(CMM.start[0], settings["dist_x"], settings["points_x"])
+        ys = grid_axis(CMM.start[1], settings["dist_y"], settings["points_y"])
 
-    print(
-        f"\r[{CMM.point}]  \033[95m\033[1mX\033[0m: Quit    "
-        f"\033[95m\033[1mW/I\033[0m: Z Up    \033[95m\033[1mS/K\033[0m: Z Down    "
-        f"\033[95m\033[1mD\033[0m: Next Grid Point    \033[95m\033[1mA\033[0m: Previous Grid Point    "
-        f"\033[95m\033[1mE\033[0m: Save & Next Grid Point\033[0m"
-    )
+        # Visit the grid in a serpentine order: odd columns run back down Y, so
+        # moving to the next column is a single step rather than a full return.
+        # index_map keeps the raster index of each point for saving.
+        for i, pos_x in enumerate(xs):
+            rows = range(len(ys)) if i % 2 == 0 else reversed(range(len(ys)))
+            for j in rows:
+                CMM.point_list.append([pos_x, ys[j]])
+                CMM.index_map.append(i * len(ys) + j)
 
-    # Main loop for grid measurement.
-    while True:
-        char = getch()
-        if char == "x":
-            print("Are you sure you want to quit? [y/n]: ", end="", flush=True)
-            while True:
-                char = getch()
-                if char.lower() == "y":
-                    exit(0)
-                elif char.lower() == "n":
-                    print("Not exiting...")
-                    break
-                else:
-                    print("Please input y or n: ", end="", flush=True)
-
-        if char == "w":
-            # Increase Z by 1mm.
-            CMM.pos[2] += 1
-            send_gcode("G0Z" + str(CMM.pos[2]))
-        elif char == "s":
-            # Decrease Z by 1mm.
-            CMM.pos[2] -= 1
-            send_gcode("G0Z" + str(CMM.pos[2]))
-        if char == "i":
-            # Increase Z by a fine step (0.1mm).
-            CMM.pos[2] += 0.1
-            send_gcode("G0Z" + str(CMM.pos[2]))
-        elif char == "k":
-            # Decrease Z by a fine step (0.1mm).
-            CMM.pos[2] -= 0.1
-            send_gcode("G0Z" + str(CMM.pos[2]))
-        elif char == "a":
-            # Navigate to the previous grid point if available.
-            if CMM.point > 0:
-                CMM.point -= 1
-                gotopoint()
-        elif char == "d":
-            # Navigate to the next grid point if available.
-            if CMM.point < len(CMM.point_list) - 1:
-                CMM.point += 1
-                gotopoint()
-        elif char == "e":
-            # Save the current measurement (position) for the current grid point.
-            CMM.datapoints[CMM.point] = CMM.pos
-            if CMM.point < len(CMM.point_list) - 1:
-                CMM.point += 1
-                gotopoint()
-            else:
-                # All grid points have been measured.
-                print("All points complete! Saving to file...")
-                print(CMM.datapoints)
-                with open(settings["output_file"], "w", newline="") as f:
-                    writer = csv.writer(f)
-                    writer.writerows(CMM.datapoints)
-                # Return machine to home position.
-                send_gcode(f"G0Z{CMM.start[2]}")
-                send_gcode(f"G0X0Y0")
-                send_gcode(f"G0Z0")
-                exit(0)
+        # Initialise one [X, Y, Z] row per grid point so unmeasured points still save.
+        print("Initialising datapoints list...")
+        CMM.datapoints = [[0, 0, 0] for _ in CMM.point_list]
 
-elif mode == "Free":
-    # --- FREE MODE: Manual Control ---
-    print(
-        f"\033[95m\033[1mX\033[0m: Quit    "
-        f"\033[95m\033[1mW/I\033[0m: Y Up    \033[95m\033[1mS/K\033[0m: Y Down    "
-        f"\033[95m\033[1mD/L\033[0m: X Up    \033[95m\033[1mA/J\033[0m: X Down    "
-        f"\033[95m\033[1mE/O\033[0m: Z Up    \033[95m\033[1mQ/U\033[0m: Z Down    "
-        f"\033[95m\033[1mP\033[0m: Save Point    \033[95m\033[1mZ\033[0m: Undo Point    "
-        f"\033[95m\033[1mG\033[0m: Save File"
-    )
-
-    # Main loop for free mode control.
-    while True:
-        char = getch()
-        if char == "x":
-            print("Are you sure you want to quit? [y/n]: ", end="", flush=True)
-            while True:
-                char = getch()
-                if char.lower() == "y":
-                    exit(0)
-                elif char.lower() == "n":
-                    print("Not exiting...")
-                    break
+        # Move to the first grid point.
+        gotopoint()
+
+        print(f"\r[{CMM.point}]  {_RECT_HELP}")
+
+        # Main loop for grid measurement.
+        while True:
+            char = read_key()
+            if char == "x":
+                flush_jogs()
+                print("Are you sure you want to quit? [y/n]: ", end="", flush=True)
+                while True:
+                    char = getch()
+                    if char.lower() == "y":
+                        exit(0)
+                    elif char.lower() == "n":
+                        print("Not exiting...")
+                        break
+                    else:
+                        print("Please input y or n: ", end="", flush=True)
+
+            if char == "w":
+                # Increase Z by 1mm.
+                queue_jog("Z", 1000)
+            elif char == "s":
+                # Decrease Z by 1mm.
+                queue_jog("Z", -1000)
+            if char == "i":
+                # Increase Z by a fine step (0.1mm).
+                queue_jog("Z", 100)
+            elif char == "k":
+                # Decrease Z by a fine step (0.1mm).
+                queue_jog("Z", -100)
+            elif char == "a":
+                # Navigate to the previous grid point if available.
+                if CMM.point > 0:
+                    CMM.point -= 1
+                    gotopoint()
+            elif char == "d":
+                # Navigate to the next grid point if available.
+                if CMM.point < len(CMM.point_list) - 1:
+                    CMM.point += 1
+                    gotopoint()
+            elif char == "e":
+                # Save the current measurement (position) for the current grid point.
+                flush_jogs()
+                CMM.datapoints[CMM.index_map[CMM.point]] = list(CMM.pos)
+                if CMM.point < len(CMM.point_list) - 1:
+                    CMM.point += 1
+                    gotopoint()
                 else:
-                    print("Please input y or n: ", end="", flush=True)
-        
-        # --- X-axis control ---
-        if char == "d" or char == "l":
-            # Increase X (move right) by 1mm or 0.1mm depending on key.
-            inc = 1 if char == "d" else 0.1
-            CMM.pos[0] += inc
-            send_gcode("G0X" + str(CMM.pos[0]))
-        if char == "a" or char == "j":
-            # Decrease X (move left) by 1mm or 0.1mm.
-            inc = 1 if char == "a" else 0.1
-            CMM.pos[0] -= inc
-            send_gcode("G0X" + str(CMM.pos[0]))
-        
-        # --- Y-axis control ---
-        if char == "w" or char == "i":
-            # Increase Y (move up) by 1mm or 0.1mm.
-            inc = 1 if char == "w" else 0.1
-            CMM.pos[1] += inc
-            send_gcode("G0Y" + str(CMM.pos[1]))
-        if char == "s" or char == "k":
-            # Decrease Y (move down) by 1mm or 0.1mm.
-            inc = 1 if char == "s" else 0.1
-            CMM.pos[1] -= inc
-            send_gcode("G0Y" + str(CMM.pos[1]))
-        
-        # --- Z-axis control ---
-        if char == "e" or char == "o":
-            # Increase Z by 1mm or 0.1mm.
-            inc = 1 if char == "e" else 0.1
-            CMM.pos[2] += inc
-            send_gcode("G0Z" + str(CMM.pos[2]))
-        if char == "q" or char == "u":
-            # Decrease Z by 1mm or 0.1mm.
-            inc = 1 if char == "q" else 0.1
-            CMM.pos[2] -= inc
-            send_gcode("G0Z" + str(CMM.pos[2]))
-        
-        # --- Datapoint management ---
-        if char == "p":
-            # Save the current position as a datapoint.
-            CMM.datapoints.append(list(CMM.pos))
-        if char == "z":
-            # Undo the last saved datapoint.
-            CMM.datapoints.pop()
-        if char == "g":
-            # Save all collected datapoints to the output CSV file.
-            with open(settings["output_file"], "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerows(CMM.datapoints)
+                    # All grid points have been measured.
+                    print("All points complete! Saving to file...")
+                    print(save_datapoints(), end="")
+                    # Return machine to home position.
+                    send_gcode_multi([
+                        move_line(Z=CMM.start[2]),
+                        move_line(X=0, Y=0),
+                        move_line(Z=0),
+                    ])
+                    exit(0)
+
+    elif mode == "Free":
+        # --- FREE MODE: Manual Control ---
+        print(_FREE_HELP)
+
+        # Main loop for free mode control.
+        while True:
+            char = read_key()
+            if char == "x":
+                flush_jogs()
+                print("Are you sure you want to quit? [y/n]: ", end="", flush=True)
+                while True:
+                    char = getch()
+                    if char.lower() == "y":
+                        exit(0)
+                    elif char.lower() == "n":
+                        print("Not exiting...")
+                        break
+                    else:
+                        print("Please input y or n: ", end="", flush=True)
+            
+            # --- X-axis control ---
+            if char == "d" or char == "l":
+                # Increase X (move right) by 1mm or 0.1mm depending on key.
+                inc = 1000 if char == "d" else 100
+                queue_jog("X", inc)
+            if char == "a" or char == "j":
+                # Decrease X (move left) by 1mm or 0.1mm.
+                inc = 1000 if char == "a" else 100
+                queue_jog("X", -inc)
+            
+            # --- Y-axis control ---
+            if char == "w" or char == "i":
+                # Increase Y (move up) by 1mm or 0.1mm.
+                inc = 1000 if char == "w" else 100
+                queue_jog("Y", inc)
+            if char == "s" or char == "k":
+                # Decrease Y (move down) by 1mm or 0.1mm.
+                inc = 1000 if char == "s" else 100
+                queue_jog("Y", -inc)
+            
+            # --- Z-axis control ---
+            if char == "e" or char == "o":
+                # Increase Z by 1mm or 0.1mm.
+                inc = 1000 if char == "e" else 100
+                queue_jog("Z", inc)
+            if char == "q" or char == "u":
+                # Decrease Z by 1mm or 0.1mm.
+                inc = 1000 if char == "q" else 100
+                queue_jog("Z", -inc)
+            
+            # --- Datapoint management ---
+            if char == "p":
+                # Save the current position as a datapoint.
+                flush_jogs()
+                CMM.datapoints.append(list(CMM.pos))
+            if char == "z":
+                # Undo the last saved datapoint.
+                CMM.datapoints.pop()
+            if char == "g":
+                # Save all collected datapoints to the output CSV file.
+                save_datapoints()